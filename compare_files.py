@@ -0,0 +1,141 @@
+"""Compare two tab-separated extract files and report cell-level diffs.
+
+Used to check that pipeline changes don't alter extracted output: run
+against a "before" and an "after" TSV export, and every changed cell is
+printed as FIELD:<col> with its BEFORE and AFTER values, one line per key.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Columns that uniquely identify a row in the extract files.
+KEY_COLS = ["AUDIT ID", "NCPDP"]
+
+
+def load_data_file(file_path, skip_rows=0):
+    """Load a tab-separated extract file with every column as text.
+
+    Prefers PyArrow's CSV reader, which parses far faster than the C
+    engine; both paths keep every value as text ("010" != "10", no
+    numeric coercion). Key columns become categoricals so key alignment
+    hits the fast path.
+    """
+    if HAS_PYARROW:
+        # pandas' pyarrow engine applies dtype=str only after type
+        # inference, which strips e.g. leading zeros. Declaring every
+        # column as string to pyarrow itself preserves the exact text.
+        with open(file_path, "r", encoding="utf-8") as f:
+            for _ in range(skip_rows):
+                f.readline()
+            header = f.readline().rstrip("\r\n").split("\t")
+        df = pa_csv.read_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(skip_rows=skip_rows),
+            parse_options=pa_csv.ParseOptions(delimiter="\t"),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in header}
+            ),
+        ).to_pandas()
+    else:
+        df = pd.read_csv(file_path, sep="\t", skiprows=skip_rows, dtype=str)
+    for col in KEY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _format_diff(stacked):
+    """Render a long-form diff frame as one line per changed key row.
+
+    Expects the key columns plus "field", "self" and "other" columns and
+    formats them with vectorized string ops instead of a per-row loop.
+    """
+    before = np.where(
+        stacked["self"].notna(),
+        "**>>BEFORE:" + stacked["self"].astype(str) + "<<**", ""
+    )
+    after = np.where(
+        stacked["other"].notna(),
+        "**>>AFTER:" + stacked["other"].astype(str) + "<<**", ""
+    )
+    stacked["field_out"] = "FIELD:" + stacked["field"].astype(str) + before + after
+
+    grouped = stacked.groupby(KEY_COLS, sort=False, observed=True)["field_out"].agg("\t".join)
+    keys = grouped.index.to_frame(index=False).astype(str).agg("|".join, axis=1)
+    return "\n".join(
+        "KEY:" + key + "\t" + fields
+        for key, fields in zip(keys, grouped.to_numpy())
+    )
+
+
+def run_comparison_test(before_path, after_path, skip_rows=0):
+    """Compare two extract files; returns True when they match."""
+    df_before = load_data_file(before_path, skip_rows)
+    df_after = load_data_file(after_path, skip_rows)
+
+    if len(df_before) != len(df_after):
+        sys.stdout.write(f"Row count mismatch: {len(df_before)} vs {len(df_after)}\n")
+        return False
+
+    # One hash join on the keys instead of building and sorting two
+    # indexed copies; the indicator column surfaces keys that exist in
+    # only one of the files.
+    merged = df_before.merge(
+        df_after, on=KEY_COLS, how="outer",
+        suffixes=("_self", "_other"), sort=False, indicator=True
+    )
+
+    missing = merged[merged["_merge"] != "both"]
+    if not missing.empty:
+        keys = missing[KEY_COLS].astype(str).agg("|".join, axis=1)
+        sides = missing["_merge"].map(
+            {"left_only": "missing in after file", "right_only": "missing in before file"}
+        )
+        sys.stdout.write("\n".join(
+            "KEY:" + key + "\t" + side for key, side in zip(keys, sides)
+        ) + "\n")
+        merged = merged[merged["_merge"] == "both"]
+
+    value_cols = [c for c in df_before.columns if c not in KEY_COLS]
+    parts = []
+    for col in value_cols:
+        self_col = merged[col + "_self"]
+        other_col = merged[col + "_other"]
+        diff_mask = (self_col.fillna("") != other_col.fillna("")).to_numpy()
+        if not diff_mask.any():
+            continue
+        part = merged.loc[diff_mask, KEY_COLS].copy()
+        part["field"] = col
+        part["self"] = self_col[diff_mask].to_numpy()
+        part["other"] = other_col[diff_mask].to_numpy()
+        parts.append(part)
+
+    if not parts and missing.empty:
+        sys.stdout.write("Files match.\n")
+        return True
+
+    if parts:
+        sys.stdout.write(_format_diff(pd.concat(parts, ignore_index=True)) + "\n")
+    return False
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.stdout.write("Usage: python compare_files.py <before.tsv> <after.tsv> [skip_rows]\n")
+        sys.exit(2)
+    skip_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    matched = run_comparison_test(sys.argv[1], sys.argv[2], skip_rows)
+    sys.exit(0 if matched else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,626 @@
+"""Shared core for the PDF table extractors.
+
+Both entry points (Excel and JSON output) dispatch into this module, so
+parsing, caching, parallelism and output writing live in one place
+instead of being duplicated per script.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Border, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+import pdfplumber
+import tkinter as tk
+from tkinter import messagebox
+import pandas as pd
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Output file name per format, overwritten on every run.
+OUTPUT_FILES = {
+    "xlsx": "extracted_table_data.xlsx",
+    "json": "extracted_table_data.json",
+}
+
+# Precompiled patterns — these run once per PDF (metadata) or once per
+# sheet/file/title (names), so compile them a single time at import.
+_RE_AUDIT = re.compile(r"AUDIT\s*ID[:\s]*([A-Za-z0-9\-]+)", re.IGNORECASE)
+_RE_NCPDP = re.compile(r"NCPDP[:\s]*([0-9]+)", re.IGNORECASE)
+_RE_DATE = re.compile(r"Date[:\s]*(\d{1,2}/\d{1,2}/\d{2,4})", re.IGNORECASE)
+_RE_ADDRESS = re.compile(
+    r"(?m)^(?:[A-Z\s]*\bPHARMACY\b[^\n]*\n(?:.*\n){0,5}?FAX[:\s]*\d+)", re.IGNORECASE
+)
+_RE_SUBJECT = re.compile(r"RE[:\s].{5,}")
+_RE_PDF_EXT = re.compile(r"\.pdf$", re.IGNORECASE)
+_RE_NAME_BAD = re.compile(r"[\\/:?*\[\]]")
+_RE_HAS_ALPHA = re.compile(r"[A-Za-z]")
+_RE_LINE_BREAK_WS = re.compile(r"\s*\n\s*")
+_RE_MULTI_SPACE = re.compile(r"\s{2,}")
+
+
+def get_base_dir():
+    """Get the base directory (supports PyInstaller .exe)."""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    else:
+        return os.path.dirname(os.path.abspath(__file__))
+
+
+def setup_logging(base_dir):
+    """Set up logging directory and file."""
+    logs_dir = os.path.join(base_dir, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    log_path = os.path.join(logs_dir, "extract_log.log")
+    logging.basicConfig(
+        filename=log_path,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        filemode="w"  # overwrite each run
+    )
+    return log_path
+
+
+def load_config(base_dir):
+    """Load config.json or create one if missing."""
+    config_path = os.path.join(base_dir, "config.json")
+    if not os.path.exists(config_path):
+        default_config = {
+            "input_path": "",
+            "output_dir": ""
+        }
+        with open(config_path, "w") as f:
+            json.dump(default_config, f, indent=4)
+        raise FileNotFoundError("config.json created. Please edit it with your paths and re-run.")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+
+def generate_sheet_name(pdf_name):
+    sheet_name = _RE_PDF_EXT.sub("", os.path.basename(pdf_name))
+    sheet_name = _RE_NAME_BAD.sub("_", sheet_name)
+    return sheet_name[:31]
+
+
+def generate_file_name(pdf_name):
+    base = _RE_PDF_EXT.sub("", os.path.basename(pdf_name))
+    safe_name = _RE_NAME_BAD.sub("_", base)
+    return safe_name
+
+
+def _update_metadata(metadata, window):
+    """Fill any still-empty metadata fields from the given text window.
+
+    Returns True once every field has a value, so the caller can stop
+    extracting page text early. Fields are only set once, keeping the
+    first match in document order.
+    """
+    if not metadata["AUDIT ID"]:
+        m = _RE_AUDIT.search(window)
+        if m:
+            metadata["AUDIT ID"] = m.group(1).strip()
+    if not metadata["NCPDP"]:
+        m = _RE_NCPDP.search(window)
+        if m:
+            metadata["NCPDP"] = m.group(1).strip()
+    if not metadata["Date"]:
+        m = _RE_DATE.search(window)
+        if m:
+            metadata["Date"] = m.group(1).strip()
+    if not metadata["Address"]:
+        m = _RE_ADDRESS.search(window)
+        if m:
+            addr_text = _RE_LINE_BREAK_WS.sub(", ", m.group(0))
+            metadata["Address"] = _RE_MULTI_SPACE.sub(" ", addr_text).strip(" ,")
+    if not metadata["Subject"]:
+        m = _RE_SUBJECT.search(window)
+        if m:
+            metadata["Subject"] = m.group(0).strip()
+    return all(metadata.values())
+
+
+# Ruling-line detection equivalent to tabula's lattice mode, but native
+# to pdfplumber — no JVM involved.
+_LATTICE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+}
+
+
+def _tabula_fallback(pdf_path):
+    """Whole-document tabula pass for PDFs whose tables have no ruling lines.
+
+    Runs inside worker processes, so failures only log here; the main
+    process shows the user a single message about a missing tabula/Java.
+    """
+    try:
+        import tabula  # imported in the worker so each subprocess gets its own JVM
+    except Exception:
+        logging.error("tabula-py or Java not found. Please ensure Java is installed and added to PATH.")
+        return []
+
+    try:
+        flat_tables = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True) or []
+    except Exception as e:
+        logging.error(f"tabula failed for {pdf_path}: {e}")
+        return []
+
+    tables = []
+    seen_titles = set()
+    for idx, table in enumerate(flat_tables, start=1):
+        if not isinstance(table, pd.DataFrame) or table.empty:
+            continue
+        table = table.dropna(how='all').reset_index(drop=True)
+        title = str(table.columns[0])
+        if not _RE_HAS_ALPHA.search(title):
+            title = f"Table_{idx}"
+        if title in seen_titles:
+            continue
+        seen_titles.add(title)
+        tables.append({"title": title, "data": table})
+    return tables
+
+
+def extract_all(pdf_path):
+    """Extract metadata and clean tables from a single open of the PDF.
+
+    Tables come from pdfplumber's own ruling-line detection (the lattice
+    case), so the common path never launches a JVM; tabula is kept only
+    as a single whole-document fallback when pdfplumber finds nothing.
+    Returns (metadata, tables) where metadata is None if the PDF has no
+    extractable text and tables hold DataFrames.
+    """
+    metadata = None
+    all_tables = []
+    try:
+        seen_titles = set()
+        metadata_fields = {
+            "AUDIT ID": "",
+            "NCPDP": "",
+            "Date": "",
+            "Address": "",
+            "Subject": ""
+        }
+        meta_done = False
+        any_text = False
+        prev_page_text = ""
+
+        with pdfplumber.open(pdf_path) as pdf:
+            if not pdf.pages:
+                return None, []
+
+            for page_num, page in enumerate(pdf.pages, start=1):
+                # Metadata usually sits on the first page or two; stop
+                # extracting page text once every field has matched. The
+                # window spans the previous page so the multi-line Address
+                # pattern can straddle a page break.
+                if not meta_done:
+                    # extract_text_simple skips pdfminer's layout analysis,
+                    # which the plain-text regex pass doesn't need. Fall back
+                    # to the full layout path only when it yields nothing.
+                    try:
+                        page_text = page.extract_text_simple() or ""
+                    except Exception:
+                        page_text = ""
+                    if not page_text.strip():
+                        page_text = page.extract_text() or ""
+                    if page_text.strip():
+                        any_text = True
+                    meta_done = _update_metadata(metadata_fields, prev_page_text + "\n" + page_text)
+                    prev_page_text = page_text
+
+                detected_tables = page.find_tables(table_settings=_LATTICE_SETTINGS)
+                if not detected_tables:
+                    continue
+
+                # Band text is computed on first use per table top and
+                # cached, so stacked tables sharing a caption line don't
+                # re-crop and re-extract the same strip of the page.
+                band_cache = {}
+
+                def get_band_text(top):
+                    band_key = round(top, 1)
+                    if band_key not in band_cache:
+                        band = page.crop((0, max(0, top - 120), page.width, top))
+                        band_cache[band_key] = band.extract_text() or ""
+                    return band_cache[band_key]
+
+                for idx, detected in enumerate(detected_tables):
+                    raw = detected.extract()
+                    if not raw or len(raw) < 2:
+                        continue
+                    table = pd.DataFrame(raw[1:], columns=raw[0])
+                    if table.empty:
+                        continue
+
+                    # Remove rows that are completely empty
+                    table = table.dropna(how='all')
+                    table = table.reset_index(drop=True)
+
+                    title = ""
+                    try:
+                        x0, top, x1, bottom = detected.bbox
+                        # Only read the narrow band above this table
+                        # instead of extracting every word on the page.
+                        if top > 0:
+                            band_lines = [
+                                ln.strip() for ln in get_band_text(top).splitlines()
+                                if ln.strip()
+                            ]
+                            if band_lines:
+                                title = band_lines[-1]
+                    except Exception as te:
+                        logging.warning(f"Could not extract table title on page {page_num}: {te}")
+
+                    if not title:
+                        # Try to detect header-like first row text
+                        possible_title = str(table.columns[0])
+                        if _RE_HAS_ALPHA.search(possible_title):
+                            title = possible_title
+                        else:
+                            title = f"Table_{page_num}_{idx+1}"
+
+                    if title in seen_titles:
+                        continue  # avoid duplicate tables
+
+                    seen_titles.add(title)
+                    all_tables.append({"title": title, "data": table})
+
+        # Metadata is settled before the fallback so a tabula failure
+        # can't discard fields that already matched.
+        if any_text:
+            metadata = metadata_fields
+
+        # No ruling-line tables anywhere: likely a stream-style layout,
+        # which tabula still handles better. One JVM call for the whole PDF.
+        if not all_tables:
+            all_tables = _tabula_fallback(pdf_path)
+
+        logging.info(f"Extracted {len(all_tables)} unique tables from {os.path.basename(pdf_path)}")
+        return metadata, all_tables
+    except Exception as e:
+        logging.error(f"Extraction failed for {pdf_path}: {e}")
+        return metadata, all_tables
+
+
+def _pdf_fingerprint(pdf_file):
+    """SHA-256 of the file contents without reading the file into memory."""
+    with open(pdf_file, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def _cache_path(pdf_file):
+    cache_dir = os.path.join(get_base_dir(), ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{_pdf_fingerprint(pdf_file)}.json")
+
+
+def _content_to_cache(content):
+    """Make extracted content JSON-serializable (split-style tables).
+
+    Header cells and cell values are stored as separate lists so
+    duplicate or blank column names — routine in ruled PDF tables —
+    survive the round trip; orient="records" would silently drop them.
+    """
+    tables = [
+        {
+            "title": t["title"],
+            "columns": [None if pd.isna(c) else str(c) for c in t["data"].columns],
+            "values": t["data"].fillna("").values.tolist(),
+        }
+        for t in content.get("tables", [])
+    ]
+    return {"metadata": content.get("metadata"), "tables": tables}
+
+
+def _content_from_cache(cached):
+    """Rebuild DataFrames from a cached JSON payload."""
+    tables = [
+        {"title": t["title"], "data": pd.DataFrame(t["values"], columns=t["columns"])}
+        for t in cached.get("tables", [])
+    ]
+    return {"metadata": cached.get("metadata"), "tables": tables}
+
+
+def _process_one_pdf(pdf_file):
+    """Worker: extract metadata and tables for a single PDF (runs in a subprocess)."""
+    logging.info(f"Processing: {pdf_file}")
+
+    # Unchanged files (same content hash) are served from the parse cache.
+    # Any cache failure — unreadable PDF while hashing, stale payload,
+    # full disk — is logged and falls through to a normal parse, so one
+    # bad file never aborts the whole batch.
+    cache_file = None
+    try:
+        cache_file = _cache_path(pdf_file)
+        if os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            logging.info(f"Cache hit for {os.path.basename(pdf_file)}")
+            return pdf_file, _content_from_cache(cached)
+    except Exception as e:
+        logging.warning(f"Cache lookup failed for {pdf_file}: {e}")
+
+    metadata, tables = extract_all(pdf_file)
+    content = {"metadata": metadata, "tables": tables}
+
+    if cache_file is not None:
+        try:
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(_content_to_cache(content), f)
+        except Exception as e:
+            logging.warning(f"Could not write cache for {pdf_file}: {e}")
+    return pdf_file, content
+
+
+def _init_worker(log_path):
+    """Configure logging inside worker processes.
+
+    Under the spawn start method (Windows / the frozen .exe) workers do
+    not inherit the parent's logging setup; append to the same log file
+    so per-PDF progress and failures keep being recorded.
+    """
+    if log_path:
+        logging.basicConfig(
+            filename=log_path,
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+        )
+
+
+def process_pdfs(pdf_files, log_path=None):
+    """Extract every PDF, fanning the files out to one worker per core."""
+    pdf_data = {}
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(log_path,),
+    ) as executor:
+        for pdf_file, content in executor.map(_process_one_pdf, pdf_files, chunksize=1):
+            pdf_data[pdf_file] = content
+    return pdf_data
+
+
+def _track_width(col_widths, col_idx, value):
+    """Keep the running max text length per column while writing cells."""
+    length = len(str(value)) if value else 0
+    if length > col_widths.get(col_idx, 0):
+        col_widths[col_idx] = length
+
+
+def _styled_cell(ws, value, style=None):
+    """Build a WriteOnlyCell carrying a registered named style."""
+    cell = WriteOnlyCell(ws, value=value)
+    if style is not None:
+        cell.style = style
+    return cell
+
+
+def write_to_excel(pdf_data, output_path):
+    """Write extracted data to an Excel workbook, one sheet per PDF.
+
+    Uses openpyxl's write-only mode, which streams rows to disk instead
+    of retaining every cell object in memory. Rows are buffered per
+    sheet because column widths must be set before the first append.
+    """
+    wb = Workbook(write_only=True)
+    border_style = Border(
+        left=Side(border_style="thin"),
+        right=Side(border_style="thin"),
+        top=Side(border_style="thin"),
+        bottom=Side(border_style="thin")
+    )
+    # Registered once per workbook; assigning the style name per cell
+    # avoids openpyxl copying border/font objects for every cell.
+    wb.add_named_style(NamedStyle(name="bordered", border=border_style))
+    wb.add_named_style(NamedStyle(name="bordered_bold", font=Font(bold=True), border=border_style))
+    wb.add_named_style(NamedStyle(name="label_bold", font=Font(bold=True)))
+
+    for pdf_file, content in pdf_data.items():
+        ws = wb.create_sheet(title=generate_sheet_name(pdf_file))
+        col_widths = {}
+        rows = []
+
+        metadata = content.get("metadata")
+        tables = content.get("tables", [])
+
+        if metadata is None:
+            rows.append([_styled_cell(ws, f"No content in PDF {os.path.basename(pdf_file)}")])
+        else:
+            rows.append([])  # leading blank row, as before
+            for field, value in metadata.items():
+                rows.append([
+                    _styled_cell(ws, field, style="bordered"),
+                    _styled_cell(ws, value, style="bordered"),
+                ])
+                _track_width(col_widths, 1, field)
+                _track_width(col_widths, 2, value)
+            rows.extend([[], []])
+
+            if not tables:
+                rows.append([_styled_cell(ws, "No tables found in this PDF.")])
+            else:
+                for table_info in tables:
+                    table = table_info["data"]
+                    title = table_info["title"]
+
+                    rows.append([
+                        _styled_cell(ws, "Table:", style="label_bold"),
+                        _styled_cell(ws, title),
+                    ])
+                    _track_width(col_widths, 1, "Table:")
+                    _track_width(col_widths, 2, title)
+
+                    # Headers
+                    header_row = []
+                    for col_idx, col_name in enumerate(table.columns, 1):
+                        header_row.append(_styled_cell(ws, str(col_name), style="bordered_bold"))
+                        _track_width(col_widths, col_idx, col_name)
+                    rows.append(header_row)
+
+                    # Data rows: stringify once and drop all-empty rows with a
+                    # single vectorized filter, so the loop has no per-row check.
+                    str_table = table.where(pd.notna(table), "").astype(str)
+                    mask = str_table.apply(lambda s: s.str.strip()).ne("").any(axis=1)
+                    str_table = str_table.loc[mask]
+                    for values in str_table.itertuples(index=False, name=None):
+                        data_row = []
+                        for col_idx, value in enumerate(values, 1):
+                            data_row.append(_styled_cell(ws, value, style="bordered"))
+                            _track_width(col_widths, col_idx, value)
+                        rows.append(data_row)
+
+                    rows.extend([[], []])  # spacing between tables
+
+        # Widths were tracked while buffering; in write-only mode they must
+        # be set before the rows are appended.
+        for col_idx, width in col_widths.items():
+            ws.column_dimensions[get_column_letter(col_idx)].width = max(width + 2, 15)
+
+        for row in rows:
+            ws.append(row)
+
+    # ✅ Overwrite Excel file (same name every run)
+    output_path = os.path.join(os.path.dirname(output_path), OUTPUT_FILES["xlsx"])
+    wb.save(output_path)
+    logging.info(f"✅ Excel file saved: {output_path}")
+    return output_path
+
+
+def write_to_json(pdf_data, output_json):
+    """Write extracted data to a JSON file."""
+    try:
+        json_serializable = {}
+        for pdf_file, content in pdf_data.items():
+            json_serializable[os.path.basename(pdf_file)] = {
+                "metadata": content.get("metadata") or {},
+                "tables": [
+                    {"title": t["title"], "data": t["data"].fillna("").to_dict(orient="records")}
+                    for t in content.get("tables", [])
+                ]
+            }
+
+        if HAS_ORJSON:
+            # orjson serializes several times faster than stdlib json and
+            # writes UTF-8 bytes directly, no intermediate str.
+            with open(output_json, "wb") as f:
+                f.write(orjson.dumps(
+                    json_serializable,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+        else:
+            with open(output_json, "w", encoding="utf-8") as f:
+                json.dump(json_serializable, f, indent=4, ensure_ascii=False)
+
+        logging.info(f"✅ JSON file saved: {output_json}")
+        return output_json
+    except Exception as e:
+        logging.error(f"Failed to write JSON: {e}")
+        return None
+
+
+WRITERS = {
+    "xlsx": write_to_excel,
+    "json": write_to_json,
+}
+
+
+def show_message(title, message):
+    """Show popup messages for non-technical users."""
+    root = tk.Tk()
+    root.withdraw()
+    messagebox.showinfo(title, message)
+    root.destroy()
+
+
+def main(output_format="xlsx"):
+    base_dir = get_base_dir()
+    log_path = setup_logging(base_dir)
+    logging.info(f"Starting PDF Table Extractor ({output_format.upper()} output)...")
+
+    try:
+        config = load_config(base_dir)
+        input_path = config.get("input_path")
+        output_dir = config.get("output_dir")
+
+        if not input_path or not os.path.exists(input_path):
+            msg = f"Invalid input path: {input_path}"
+            logging.error(msg)
+            show_message("Error", msg)
+            return
+
+        if not output_dir:
+            msg = "Output directory not specified in config.json."
+            logging.error(msg)
+            show_message("Error", msg)
+            return
+
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, OUTPUT_FILES[output_format])
+
+        # Identify PDF files; scandir batches the dirent info, so large
+        # input folders scan without a stat call per entry.
+        if os.path.isdir(input_path):
+            with os.scandir(input_path) as it:
+                pdf_files = [
+                    entry.path for entry in it
+                    if entry.is_file() and entry.name.endswith((".pdf", ".PDF"))
+                ]
+        elif input_path.lower().endswith(".pdf"):
+            pdf_files = [input_path]
+        else:
+            pdf_files = []
+
+        if not pdf_files:
+            msg = f"No PDF files found in {input_path}"
+            logging.warning(msg)
+            show_message("Warning", msg)
+            return
+
+        # Workers only log when tabula/Java is missing; check once here so
+        # the user sees a single popup instead of one per subprocess.
+        try:
+            import tabula  # noqa: F401
+        except Exception:
+            logging.error("tabula-py or Java not found. Stream-layout PDFs will have no table fallback.")
+            show_message("Warning", "Java/tabula not found.\nTables without ruling lines may be missed.")
+
+        pdf_data = process_pdfs(pdf_files, log_path)
+
+        if pdf_data:
+            written = WRITERS[output_format](pdf_data, output_file)
+            if written:
+                show_message("Success", f"Extraction completed.\nOutput saved to:\n{written}")
+        else:
+            msg = "No data extracted from any files."
+            logging.warning(msg)
+            show_message("Warning", msg)
+
+        logging.info(f"Log file: {log_path}")
+
+    except Exception as e:
+        err = f"Unexpected error: {e}"
+        logging.error(err)
+        show_message("Error", err)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # required for ProcessPoolExecutor in the frozen .exe
+    main()
@@ -0,0 +1,48 @@
+"""Regression tests for the TSV compare tool."""
+
+import compare_files
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_load_keeps_every_column_as_text(tmp_path):
+    # Blank cell in a numeric-looking column must not coerce the column.
+    before = _write(
+        tmp_path / "before.tsv",
+        "AUDIT ID\tNCPDP\tAmount\nA-1\t123\t010\nA-2\t456\t\n"
+    )
+    df = compare_files.load_data_file(before)
+    amounts = df["Amount"].fillna("").tolist()
+    assert amounts == ["010", ""]
+
+
+def test_blank_numeric_cell_does_not_crash_and_text_semantics_hold(tmp_path):
+    before = _write(
+        tmp_path / "before.tsv",
+        "AUDIT ID\tNCPDP\tAmount\nA-1\t123\t010\nA-2\t456\t\n"
+    )
+    # "010" vs "10" are equal as numbers but must differ as text.
+    after = _write(
+        tmp_path / "after.tsv",
+        "AUDIT ID\tNCPDP\tAmount\nA-1\t123\t10\nA-2\t456\t\n"
+    )
+    assert compare_files.run_comparison_test(before, before) is True
+    assert compare_files.run_comparison_test(before, after) is False
+
+
+def test_mismatched_keys_are_reported_not_dropped(tmp_path, capsys):
+    before = _write(
+        tmp_path / "before.tsv",
+        "AUDIT ID\tNCPDP\tAmount\nA-1\t123\t5\nA-2\t456\t7\n"
+    )
+    after = _write(
+        tmp_path / "after.tsv",
+        "AUDIT ID\tNCPDP\tAmount\nA-1\t123\t5\nA-3\t789\t7\n"
+    )
+    assert compare_files.run_comparison_test(before, after) is False
+    out = capsys.readouterr().out
+    assert "A-2" in out and "missing in after file" in out
+    assert "A-3" in out and "missing in before file" in out